@@ -22,7 +22,12 @@ class ListToken:
         v += self.element
         if reference:
             v += "</a>"
-        if self.cardinality:
+        if self.cardinality == ",":
+            v += "(" + self.minimum
+            if self.maximum:
+                v += "," + self.maximum
+            v += ")"
+        elif self.cardinality:
             v += self.cardinality
         if self.next:
             if self.next == "|":
@@ -228,7 +233,9 @@ class IPFIX:
                 else:
                     self.enums[item.name] = item
                     if item.value != None and item.value in self.enumByValue:
-                        PrintError(node, "Value '" + format(item.value, "#x") + "' defined twice in enumeration", file=sys.stderr)
+                        PrintError(node, "Value '" + format(item.value, "#x") + "' defined twice in enumeration")
+                    elif item.value != None:
+                        self.enumByValue[item.value] = item
             return item
         except SyntaxError as e:
             PrintError(node, e.msg)
@@ -257,7 +264,7 @@ class IPFIX:
         fullLine = " ".join(fullLine)
         fullLine = fullLine.strip()
         # print("OrderedList: '" + fullLine + "'", file=sys.stderr)
-        tokens = re.split("([\(\)\+,?|])", fullLine)
+        tokens = re.split("([\(\)\+\*,?|])", fullLine)
         if tokens[0].strip() != "orderedList":
             PrintError(node, "OrderedList element does not have list structure " + tokens[0])
         self.buildListTokens(node, tokens[1:])
@@ -267,7 +274,7 @@ class IPFIX:
         fullLine = " ".join(fullLine)
         fullLine = fullLine.strip()
         # print("List: '" + fullLine + "'", file=sys.stderr)
-        tokens = re.split("([\(\)\+,?|])", fullLine)
+        tokens = re.split("([\(\)\+\*,?|])", fullLine)
         if tokens[0].strip() != "list":
             PrintError(node, "List element does not have list structure " + tokens[0])
         self.buildListTokens(node, tokens[1:])
@@ -328,7 +335,7 @@ class IPFIX:
                     state = "next"
                     token = None
                 elif token == "(":
-                    newToken.cardiality = ","
+                    newToken.cardinality = ","
                     state = "minimum"
                     token = None
                 elif token == "|" or token == "," or token == ")":
@@ -345,7 +352,8 @@ class IPFIX:
                     token = None
                     state = "comma"
             elif state == "comma":
-                if token == "|" or token == "," or token == ")":
+                if token == ")":
+                    token = None
                     state = "next"
                 elif token == ",":
                     state = "max"
@@ -367,6 +375,7 @@ class IPFIX:
                     state = "next"
                 else:
                     PrintError(node, "Expected ')', found token " + token)
+                    return
             elif state == "next":
                 if token == ',' or token == '|':
                     newToken.next = token
@@ -399,6 +408,8 @@ def main():
                              dest='csv', help='Output CSV format')
     plain_options.add_option('-A', '--asn', action='store_true',
                              dest='asn', help='Output ASN.1 format')
+    plain_options.add_option('-D', '--der', action='store_true',
+                             dest='der', help='Output DER encoder/decoder (Python)')
     plain_options.add_option('-o', '--output', help='file to print to',
                              dest='output', action='store')
                              
@@ -429,17 +440,10 @@ def main():
            "signed8":None, "signed16":None, "signed32":None, "signed64":None,
            "float32":None, "float64":None, "boolean":None, "macAddress":None,
            "string":None, "dateTimeSeconds":None, "dateTimeMilliseconds":None,
-           "dateTimeNanoseconds":None, "ipv4Address":None, "ipv6Address":None,
-           "octetArray":None, "list":None, "orderedList":None, "enumeration":None
+           "dateTimeNanoseconds":None, "ipv4Address":None, "ipv6Address":None, "ipAddress":None,
+           "octetArray":None, "list":None, "orderedList":None, "enumeration":None, "category":None
     }
 
-    asn1 = {"octetArray":"OCTET STRING", "string":"UTF8String",
-            "unsigned8":"INTEGER", "unsigned16":"INTEGER", "unsigned32":"INTEGER", "unsigned64":"INTEGER",
-            "signed8":"INTEGER", "signed16":"INTEGER", "signed32":"INTEGER", "signed64":"INTEGER",
-            "float32":"FLOAT", "float64":"FLOAT",
-            "boolean":"BOOLEAN"
-            }
-    
     for element in tree.getroot().iter():
         if element.tag == "artwork" and "type" in element.attrib:
             try:
@@ -455,7 +459,7 @@ def main():
         if v != None:
             if v.dataType not in all:
                 PrintError(None, k + " dataType '" + v.dataType + "' not defined")
-            if (v.dataType == "list" or v.dataType == "orderedList") and (v.tokenList != None):
+            if (v.dataType == "list" or v.dataType == "orderedList" or v.dataType == "category") and (v.tokenList != None):
                 for token in v.tokenList:
                     if token.element not in all:
                         PrintError(None, "List item '" + token.element + "' not defined")
@@ -496,42 +500,6 @@ def main():
     if options.csv:
         print("elementId,enterpriseId,name,dataType,status,description,structure,references", file=fout)
 
-    if options.asn:
-        print("SACM")
-        print("DEFINITIONS IMPLICIT TAGS ::=")
-        print("BEGIN")
-        print("")
-        print("    ContentElement ::= SEQUENCE {")
-        print("        content-metaData ::= SEQUENCE {")
-        print("             I DONT KNOW WHAT GOES HERE ")
-        print("        },")
-        print("        subjects  SEQUENCE (1..MAX) OF CHOICE {")
-        print("")
-        print("    SacmStatement ::= SEQUENCE {")
-        print("        statementMetaData ::= SEQUENCE {")
-        print("            I DONT KNOW WHAT GOES HERE ")
-        print("        },")
-        print("        node CHOICE {")
-        print("            contentElements SEQUENCE OF (1..MAX) ContentElement")
-        print("            event SEQUENCE {")
-        print("                eventAttributes SEQUENCE {")
-        print("                    eventName UTF8String,")
-        print("                    contentElement SEQUENCE OF (1..MAX) ContentElement")
-        print("                }")
-        print("            }")
-        print("        }")
-        print("    }")
-
-        print("    Statements ::= CHOICE {")
-        for k,v in all.items():
-            if v != None:
-                continue
-                # print("        {0}    [{1!s}] {2},".format(v.name, v.id, asn1[v.dataType] if v.dataType in asn1 else v.name), file=fout)
-        print("        ...")
-        print("    }")
-        print("")
-        
-
     for k,v in all.items():
         if v != None:
             if options.html:
@@ -589,18 +557,12 @@ def main():
                     tmp += v.references
                      
                 print(tmp, file=fout)
-            elif options.asn:
-                if not v.dataType in asn1:
-                    print("", file=fout)
-                    if v.enumeration:
-                        ASN_EmitEnumeration(v, fout)
-                    elif v.tokenList:
-                        ASN_EmitTokenList(v, fout)
-                    else:
-                        #if v.description:
-                        #    print("-- " + v.description);
-                        print("X_" + v.name + " ::= " + v.dataType, file=fout)
     
+    if options.asn:
+        ASN_EmitModule(ASNResolver(all), fout)
+    elif options.der:
+        DER_EmitCodec(ASNResolver(all), source, fout)
+
     if options.html:
         print("</tbody>", file=fout)
         print("</body>", file=fout)
@@ -623,47 +585,761 @@ def PrintError(node, text):
     else:
         print("Error at line {0!s}: {1}".format(node.sourceline, text), file=sys.stderr)
 
-def ASN_EmitEnumeration(v, fout):
-    print("X_" + v.name + " ::= ENUMERATED {", file=fout)
-    for e in v.enumeration:
-        x = ""
-        if e.value:
-            x = "({0!s})".format(e.value)
-        # print("    {0}{1},".format(e.name, x), file=fout)
-    print("    ...", file=fout)
-    print("}", file=fout)
+# ASN.1 type, size constraint and value range used for each of the
+# IPFIX abstract data types.
+ASN_BaseTypes = {
+    "octetArray": ("OCTET STRING", None, None),
+    "string": ("UTF8String", None, None),
+    "unsigned8": ("INTEGER", None, "0..255"),
+    "unsigned16": ("INTEGER", None, "0..65535"),
+    "unsigned32": ("INTEGER", None, "0..4294967295"),
+    "unsigned64": ("INTEGER", None, "0..18446744073709551615"),
+    "signed8": ("INTEGER", None, "-128..127"),
+    "signed16": ("INTEGER", None, "-32768..32767"),
+    "signed32": ("INTEGER", None, "-2147483648..2147483647"),
+    "signed64": ("INTEGER", None, "-9223372036854775808..9223372036854775807"),
+    "float32": ("REAL", None, None),
+    "float64": ("REAL", None, None),
+    "boolean": ("BOOLEAN", None, None),
+    "macAddress": ("OCTET STRING", [6], None),
+    "ipv4Address": ("OCTET STRING", [4], None),
+    "ipv6Address": ("OCTET STRING", [16], None),
+    "ipAddress": ("OCTET STRING", [4, 16], None),
+    "dateTimeSeconds": ("INTEGER", None, "0..4294967295"),
+    "dateTimeMilliseconds": ("INTEGER", None, "0..18446744073709551615"),
+    "dateTimeNanoseconds": ("INTEGER", None, "0..18446744073709551615")
+}
+
+ASN_UniversalTags = {"BOOLEAN": 0x01, "INTEGER": 0x02, "OCTET STRING": 0x04,
+                     "REAL": 0x09, "ENUMERATED": 0x0a, "UTF8String": 0x0c,
+                     "SEQUENCE": 0x30, "SEQUENCE OF": 0x30, "SET": 0x31}
+
+
+class ASNType:
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.reference = None
+        self.size = None
+        self.range = None
+        self.enumeration = None
+        self.components = None
+        self.element = None
+        self.alias = None
+        self.extensible = False
+        self.comment = None
+
+    def isConstructed(self):
+        return self.kind in ("SEQUENCE", "SET", "SEQUENCE OF", "CHOICE")
+
+    def fixedLength(self):
+        if self.kind == "BOOLEAN":
+            return 1
+        if self.size and len(self.size) == 1:
+            return self.size[0]
+        return None
+
+    def toString(self):
+        if self.reference:
+            return self.reference
+        return self.body()
+
+    def body(self):
+        v = self.kind
+        if self.size:
+            v += " (SIZE (" + " | ".join([str(x) for x in self.size]) + "))"
+        if self.range:
+            v += " (" + self.range + ")"
+        return v
+
+
+class ASNComponent:
+    def __init__(self, identifier, key, number, type):
+        self.identifier = identifier
+        self.key = key
+        self.number = number
+        self.type = type
+        self.optional = False
+        self.minimum = None
+        self.maximum = None
+        self.comment = None
+
+    def toString(self):
+        v = "{0} [{1!s}] ".format(self.identifier, self.number)
+        if self.minimum != None:
+            if self.minimum == 0 and self.maximum == None:
+                v += "SEQUENCE OF "
+            else:
+                v += "SEQUENCE SIZE ({0!s}..{1}) OF ".format(self.minimum, self.maximum if self.maximum != None else "MAX")
+        v += self.type.toString()
+        if self.optional:
+            v += " OPTIONAL"
+        return v
+
 
-def ASN_EmitTokenList(v, fout):
-    # ordered ==> SEQUENCE
-    xx = ""
-    for i in v.tokenList:
-        xx += i.toString(False)
-    print("-- " + xx)
-    seq = "CHOICE"
-    for i in v.tokenList:
-        if i.next and i.next != "|":
-            seq = "SET"
-            if v.dataType == "orderedList":
-                seq = "SEQUENCE"
-            break
-
-    print("X_{0} ::= {1} {{".format(v.name, seq), file=fout)
-    inChoice = False
-    for i in v.tokenList:
-        optional = ""
-        sequence = ""
-        if i.cardinality:
+# Resolves every information element to its ASN.1 type.  Types are
+# memoized by name and collected in dependency order, so a type only
+# refers to types that come before it unless the tokenList graph is
+# recursive.
+class ASNResolver:
+    def __init__(self, all):
+        self.all = all
+        self.types = {}
+        self.order = []
+        self.builtins = []
+        self.undefined = None
+        self.statements = ASNType("Statements", "CHOICE")
+        self.statements.reference = "Statements"
+        self.statements.extensible = True
+
+        for k, v in all.items():
+            if v != None:
+                self.resolve(k)
+        self.buildStatements()
+
+    def resolve(self, name):
+        if name in self.types:
+            return self.types[name]
+        v = self.all.get(name)
+        if v == None:
+            if name not in ASN_BaseTypes:
+                return None
+            t = ASNType(name, ASN_BaseTypes[name][0])
+            t.size = ASN_BaseTypes[name][1]
+            t.range = ASN_BaseTypes[name][2]
+            self.types[name] = t
+            self.builtins.append(t)
+            return t
+
+        enumeration = None
+        if v.dataType == "enumeration":
+            enumeration = self.buildEnumeration(v)
+
+        if v.dataType in ASN_BaseTypes:
+            kind = ASN_BaseTypes[v.dataType][0]
+        elif enumeration:
+            kind = "ENUMERATED"
+        elif v.dataType == "enumeration":
+            kind = "INTEGER"
+        elif v.dataType == "category":
+            kind = "CHOICE"
+        elif v.tokenList and all(i.next == "|" for i in v.tokenList[:-1]) and len(v.tokenList) > 1:
+            kind = "CHOICE"
+        elif v.tokenList and v.dataType == "orderedList":
+            kind = "SEQUENCE"
+        elif v.tokenList and v.dataType == "list":
+            kind = "SET"
+        elif v.dataType == "list" or v.dataType == "orderedList":
+            kind = "SEQUENCE OF"
+        else:
+            PrintError(None, "ASN.1 type of '" + name + "' is unknown, using OCTET STRING")
+            kind = "OCTET STRING"
+
+        if v.tokenList and kind != "CHOICE" and "|" in [i.next for i in v.tokenList]:
+            PrintError(None, "'" + name + "' mixes ',' and '|' in its " + v.dataType + ", treating it as " + kind)
+
+        t = ASNType(name, kind)
+        t.reference = ASN_TypeReference(name)
+        self.types[name] = t
+
+        if v.dataType in ASN_BaseTypes:
+            t.size = ASN_BaseTypes[v.dataType][1]
+            t.range = ASN_BaseTypes[v.dataType][2]
+        elif enumeration:
+            t.enumeration = enumeration
+            t.extensible = True
+        elif v.tokenList:
+            t.comment = "".join([i.toString(False) for i in v.tokenList])
+            t.components = self.buildComponents(t, v.tokenList)
+        elif kind == "CHOICE":
+            t.alias = self.statements
+        elif kind == "SEQUENCE OF":
+            t.element = self.statements
+
+        self.order.append(t)
+        return t
+
+    def buildEnumeration(self, v):
+        if not v.enumeration:
+            return None
+        used = set()
+        values = set()
+        enumeration = []
+        for e in v.enumeration:
+            if e.value == None or e.value in values:
+                continue
+            values.add(e.value)
+            enumeration.append((ASN_Unique(ASN_Identifier(e.name), used), e.name, e.value))
+        return enumeration
+
+    def buildComponents(self, t, tokenList):
+        used = set()
+        keys = set()
+        components = []
+        for i in tokenList:
+            type = self.resolve(i.element)
+            comment = None
+            if type == None:
+                type = self.placeholder()
+                comment = "undefined: " + i.element
+            key = i.element
+            n = 2
+            while key in keys:
+                key = i.element + "-" + str(n)
+                n += 1
+            keys.add(key)
+            c = ASNComponent(ASN_Unique(ASN_Identifier(i.element), used), key, len(components), type)
+            c.comment = comment
             if i.cardinality == "?":
-                optional = "OPTIONAL"
+                c.optional = t.kind != "CHOICE"
             elif i.cardinality == "+":
-                sequence = "SEQUENCE OF (1..MAX)"
+                c.minimum = 1
             elif i.cardinality == "*":
-                sequence = "SEQUENCE OF (0..MAX)"
+                c.minimum = 0
             elif i.cardinality == ",":
-                sequence = "SEQUENCE OF ({0!s}..{1!s}".format(i.minimum, self.maximum if self.maximum else "MAX")
-                
-        print("    {0} {3} {1} {2}{4}".format(i.element, "X_" + i.element, optional, sequence, "," if i.next else ""), file=fout)
+                c.minimum = int(i.minimum)
+                if i.maximum:
+                    c.maximum = int(i.maximum)
+            components.append(c)
+        return components
+
+    # Components whose element is not defined keep their place in the
+    # structure as an OCTET STRING, so the wire format does not change
+    # once the element is defined.
+    def placeholder(self):
+        if self.undefined == None:
+            self.undefined = ASNType("_undefined", "OCTET STRING")
+            self.builtins.append(self.undefined)
+        return self.undefined
+
+    # Elements are tagged with their elementId.  Elements without a
+    # numeric elementId get the next free tag, in document order.
+    def buildStatements(self):
+        numbers = set()
+        tagged = []
+        for k, v in self.all.items():
+            if v == None:
+                continue
+            number = None
+            if re.match("^\d+$", v.id):
+                number = int(v.id)
+                if number in numbers:
+                    PrintError(None, "elementId " + v.id + " of '" + k + "' used twice")
+                    number = None
+                else:
+                    numbers.add(number)
+            tagged.append((k, number))
+
+        next = max(numbers) + 1 if numbers else 0
+        used = set()
+        self.statements.components = []
+        for k, number in tagged:
+            comment = None
+            if number == None:
+                number = next
+                next += 1
+                comment = "elementId " + self.all[k].id
+            c = ASNComponent(ASN_Unique(ASN_Identifier(k), used), k, number, self.types[k])
+            c.comment = comment
+            self.statements.components.append(c)
+        if not tagged:
+            PrintError(None, "No information elements defined, Statements has no alternatives")
+
+
+def ASN_Identifier(name):
+    words = [x for x in re.split("[^0-9A-Za-z]+", name) if x]
+    if not words:
+        return "x"
+    if words[0].isupper():
+        words[0] = words[0].lower()
+    else:
+        words[0] = words[0][0].lower() + words[0][1:]
+    if words[0][0].isdigit():
+        words.insert(0, "x")
+    return "-".join(words)
+
+def ASN_TypeReference(name):
+    return "-".join(["X"] + [x for x in re.split("[^0-9A-Za-z]+", name) if x])
+
+def ASN_Unique(identifier, used):
+    x = identifier
+    n = 2
+    while x in used:
+        x = identifier + "-" + str(n)
+        n += 1
+    used.add(x)
+    return x
+
+def ASN_EmitModule(types, fout):
+    print("SACM", file=fout)
+    print("DEFINITIONS IMPLICIT TAGS ::=", file=fout)
+    print("BEGIN", file=fout)
+    if types.statements.components:
+        print("", file=fout)
+        print("-- Any SACM information element, tagged with its elementId", file=fout)
+        ASN_EmitTokenList(types.statements, fout)
+    for t in types.order:
+        print("", file=fout)
+        if t.enumeration:
+            ASN_EmitEnumeration(t, fout)
+        elif t.components != None:
+            ASN_EmitTokenList(t, fout)
+        elif t.alias:
+            print("{0} ::= {1}".format(t.reference, t.alias.toString()), file=fout)
+        elif t.element:
+            print("{0} ::= SEQUENCE OF {1}".format(t.reference, t.element.toString()), file=fout)
+        else:
+            print("{0} ::= {1}".format(t.reference, t.body()), file=fout)
+    print("", file=fout)
+    print("END", file=fout)
+
+def ASN_EmitEnumeration(t, fout):
+    print("{0} ::= ENUMERATED {{".format(t.reference), file=fout)
+    for identifier, name, value in t.enumeration:
+        print("    {0}({1!s}),".format(identifier, value), file=fout)
+    print("    ...", file=fout)
     print("}", file=fout)
 
+def ASN_EmitTokenList(t, fout):
+    if t.comment:
+        print("-- " + t.comment, file=fout)
+    print("{0} ::= {1} {{".format(t.reference, t.kind), file=fout)
+    for i, c in enumerate(t.components):
+        x = "    " + c.toString()
+        if i + 1 < len(t.components) or t.extensible:
+            x += ","
+        if c.comment:
+            x += "  -- " + c.comment
+        print(x, file=fout)
+    if t.extensible:
+        print("    ...", file=fout)
+    print("}", file=fout)
+
+
+# Runtime shared by every generated DER codec.  Each type has a content
+# encoder _e_X(buf, value) that appends to a single bytearray and a
+# content decoder _d_X(data, start, end).  Callers write the precomputed
+# tag and a one octet length placeholder, which _close() patches once
+# the content length is known.
+DER_Runtime = '''
+import math
+
+
+class DecodeError(ValueError):
+    pass
+
+
+# Deepest nesting of constructed values the decoders accept.
+_MAX_DEPTH = 100
+
+
+def _close(buf, start):
+    n = len(buf) - start
+    if n < 0x80:
+        buf[start - 1] = n
+    else:
+        k = (n.bit_length() + 7) >> 3
+        buf[start - 1:start] = bytes((0x80 | k,)) + n.to_bytes(k, "big")
+
+
+def _int(v):
+    return v.to_bytes(((v + (v < 0)).bit_length() >> 3) + 1, "big", signed=True)
+
+
+def _real(v):
+    if v != v:
+        return b"\\x42"
+    if v == 0:
+        return b"\\x43" if math.copysign(1.0, v) < 0 else b""
+    if math.isinf(v):
+        return b"\\x40" if v > 0 else b"\\x41"
+    m, e = math.frexp(abs(v))
+    m = int(m * 9007199254740992)
+    e -= 53
+    z = (m & -m).bit_length() - 1
+    m >>= z
+    x = _int(e + z)
+    return bytes(((0xc0 if v < 0 else 0x80) | (len(x) - 1),)) + x + m.to_bytes((m.bit_length() + 7) >> 3, "big")
+
+
+def _tag(data, pos, end):
+    p = pos + 1
+    if p > end:
+        raise DecodeError("truncated tag")
+    if data[pos] & 0x1f == 0x1f:
+        if p < end and data[p] == 0x80:
+            raise DecodeError("tag is not minimally encoded")
+        n = 0
+        while True:
+            if p >= end:
+                raise DecodeError("truncated tag")
+            n = (n << 7) | (data[p] & 0x7f)
+            p += 1
+            if not data[p - 1] & 0x80:
+                break
+        if n < 31:
+            raise DecodeError("tag is not minimally encoded")
+    return bytes(data[pos:p])
+
+
+def _len(data, pos, end):
+    if pos >= end:
+        raise DecodeError("truncated length")
+    n = data[pos]
+    pos += 1
+    if n & 0x80:
+        k = n & 0x7f
+        if k == 0 or pos + k > end:
+            raise DecodeError("invalid length")
+        n = int.from_bytes(data[pos:pos + k], "big")
+        if n < 0x80 or data[pos] == 0:
+            raise DecodeError("length is not minimally encoded")
+        pos += k
+    if pos + n > end:
+        raise DecodeError("truncated value")
+    return pos, pos + n
+
+
+def _tl(data, pos, end, tag):
+    if pos >= end or not data.startswith(tag, pos):
+        raise DecodeError("expected tag " + tag.hex() + " at offset " + str(pos))
+    return _len(data, pos + len(tag), end)
+
+
+def _skip(data, pos, end):
+    return _len(data, pos + len(_tag(data, pos, end)), end)[1]
+
+
+def _dint(data, s, e, depth=0):
+    if s == e:
+        raise DecodeError("empty INTEGER")
+    if e - s > 1 and ((data[s] == 0 and not data[s + 1] & 0x80) or (data[s] == 0xff and data[s + 1] & 0x80)):
+        raise DecodeError("INTEGER is not minimally encoded")
+    return int.from_bytes(data[s:e], "big", signed=True)
+
+
+def _dbool(data, s, e, depth=0):
+    if e - s != 1 or data[s] not in (0, 0xff):
+        raise DecodeError("invalid BOOLEAN")
+    return data[s] == 0xff
+
+
+def _dreal(data, s, e, depth=0):
+    if s == e:
+        return 0.0
+    f = data[s]
+    if f & 0x80:
+        if f & 0x3c:
+            raise DecodeError("REAL is not base 2 with scale factor 0")
+        p = s + 1
+        k = (f & 3) + 1
+        if k == 4:
+            if p >= e:
+                raise DecodeError("truncated REAL")
+            k = data[p]
+            p += 1
+            if k < 4:
+                raise DecodeError("REAL exponent is not minimally encoded")
+        if p + k >= e:
+            raise DecodeError("truncated REAL")
+        if k > 1 and ((data[p] == 0 and not data[p + 1] & 0x80) or (data[p] == 0xff and data[p + 1] & 0x80)):
+            raise DecodeError("REAL exponent is not minimally encoded")
+        if data[p + k] == 0 or not data[e - 1] & 1:
+            raise DecodeError("REAL mantissa is not normalized")
+        x = int.from_bytes(data[p:p + k], "big", signed=True)
+        try:
+            v = math.ldexp(int.from_bytes(data[p + k:e], "big"), x)
+        except OverflowError:
+            raise DecodeError("REAL out of range")
+        return -v if f & 0x40 else v
+    if f & 0x40:
+        if e - s != 1 or f > 0x43:
+            raise DecodeError("invalid REAL")
+        return (math.inf, -math.inf, math.nan, -0.0)[f & 3]
+    raise DecodeError("decimal REAL encoding is not supported")
+'''
+
+def DER_Name(t):
+    return re.sub("\W", "_", t.name)
+
+def DER_Tag(number, constructed):
+    first = 0xa0 if constructed else 0x80
+    if number < 31:
+        return bytes([first | number])
+    octets = [number & 0x7f]
+    number >>= 7
+    while number:
+        octets.insert(0, 0x80 | (number & 0x7f))
+        number >>= 7
+    return bytes([first | 0x1f] + octets)
+
+def DER_UniversalTag(t):
+    if t.kind == "CHOICE":
+        return None
+    return bytes([ASN_UniversalTags[t.kind]])
+
+# Returns the precomputed tag, content encoder, content decoder and
+# fixed content length for a component.
+def DER_Component(t, i, c):
+    if c.minimum != None:
+        x = "{0}_{1!s}".format(DER_Name(t), i)
+        return DER_Tag(c.number, True), "_e_" + x, "_d_" + x, None
+    x = DER_Name(c.type)
+    return DER_Tag(c.number, c.type.isConstructed()), "_e_" + x, "_d_" + x, c.type.fixedLength()
+
+def DER_EmitEncode(tag, encoder, fixed, value, indent, fout):
+    if tag == None:
+        print("{0}{1}(buf, {2})".format(indent, encoder, value), file=fout)
+    elif fixed != None:
+        print("{0}buf += {1!r}".format(indent, tag + bytes([fixed])), file=fout)
+        print("{0}{1}(buf, {2})".format(indent, encoder, value), file=fout)
+    else:
+        print("{0}buf += {1!r}".format(indent, tag + b"\x00"), file=fout)
+        print("{0}s = len(buf)".format(indent), file=fout)
+        print("{0}{1}(buf, {2})".format(indent, encoder, value), file=fout)
+        print("{0}_close(buf, s)".format(indent), file=fout)
+
+def DER_EmitDecode(tag, decoder, target, indent, fout):
+    if tag == None:
+        print("{0}e = _skip(data, pos, end)".format(indent), file=fout)
+        print(indent + target.format(decoder + "(data, pos, e, depth + 1)"), file=fout)
+    else:
+        print("{0}s, e = _tl(data, pos, end, {1!r})".format(indent, tag), file=fout)
+        print(indent + target.format(decoder + "(data, s, e, depth + 1)"), file=fout)
+    print("{0}pos = e".format(indent), file=fout)
+
+def DER_EmitDepthCheck(fout):
+    print("    if depth > _MAX_DEPTH:", file=fout)
+    print("        raise DecodeError(\"nesting too deep\")", file=fout)
+
+def DER_EmitSequenceOf(name, element, minimum, maximum, fout):
+    tag = DER_UniversalTag(element)
+    x = DER_Name(element)
+    print("", file=fout)
+    print("def _e_{0}(buf, v):".format(name), file=fout)
+    if minimum or maximum != None:
+        print("    if len(v) < {0!s}{1}:".format(minimum, "" if maximum == None else " or len(v) > " + str(maximum)), file=fout)
+        print("        raise ValueError(\"wrong number of elements\")", file=fout)
+    print("    for x in v:", file=fout)
+    DER_EmitEncode(tag, "_e_" + x, element.fixedLength(), "x", "        ", fout)
+    print("", file=fout)
+    print("def _d_{0}(data, pos, end, depth):".format(name), file=fout)
+    DER_EmitDepthCheck(fout)
+    print("    v = []", file=fout)
+    print("    while pos < end:", file=fout)
+    DER_EmitDecode(tag, "_d_" + x, "v.append({0})", "        ", fout)
+    if minimum or maximum != None:
+        print("    if len(v) < {0!s}{1}:".format(minimum, "" if maximum == None else " or len(v) > " + str(maximum)), file=fout)
+        print("        raise DecodeError(\"wrong number of elements\")", file=fout)
+    print("    return v", file=fout)
+
+def DER_EmitCodec(types, source, fout):
+    print("# DER encoder and decoder for the SACM ASN.1 module.", file=fout)
+    print("# Generated by check.py from " + os.path.basename(source) + ", do not edit.", file=fout)
+    print(DER_Runtime, file=fout)
+    tables = []
+    aliases = []
+
+    for t in types.builtins + types.order + [types.statements]:
+        name = DER_Name(t)
+        if t.alias:
+            aliases.append((name, DER_Name(t.alias)))
+            continue
+        if t.element:
+            DER_EmitSequenceOf(name, t.element, 0, None, fout)
+            continue
+
+        print("", file=fout)
+        if t.reference:
+            print("# " + t.reference, file=fout)
+        if t.kind == "CHOICE":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    key, x = v", file=fout)
+            if t.extensible:
+                print("    if key is None:", file=fout)
+                print("        buf += x", file=fout)
+                print("        return", file=fout)
+            print("    buf += _A_{0}[key]".format(name), file=fout)
+            print("    s = len(buf)", file=fout)
+            print("    _E_{0}[key](buf, x)".format(name), file=fout)
+            print("    _close(buf, s)", file=fout)
+            print("", file=fout)
+            print("def _d_{0}(data, pos, end, depth):".format(name), file=fout)
+            DER_EmitDepthCheck(fout)
+            print("    tag = _tag(data, pos, end)", file=fout)
+            print("    if tag not in _D_{0}:".format(name), file=fout)
+            if t.extensible:
+                print("        if _skip(data, pos, end) != end:", file=fout)
+                print("            raise DecodeError(\"unexpected data in {0}\")".format(t.reference), file=fout)
+                print("        return None, bytes(data[pos:end])", file=fout)
+            else:
+                print("        raise DecodeError(\"unknown alternative of {0}\")".format(t.reference), file=fout)
+            print("    key, decoder = _D_{0}[tag]".format(name), file=fout)
+            print("    s, e = _tl(data, pos, end, tag)", file=fout)
+            print("    if e != end:", file=fout)
+            print("        raise DecodeError(\"unexpected data in {0}\")".format(t.reference), file=fout)
+            print("    return key, decoder(data, s, e, depth + 1)", file=fout)
+            a = []
+            en = []
+            de = []
+            for i, c in enumerate(t.components):
+                tag, encoder, decoder, fixed = DER_Component(t, i, c)
+                a.append("    {0!r}: {1!r},".format(c.key, tag + bytes([fixed or 0])))
+                en.append("    {0!r}: {1},".format(c.key, encoder))
+                de.append("    {0!r}: ({1!r}, {2}),".format(tag, c.key, decoder))
+            tables.append(("_A_" + name, a))
+            tables.append(("_E_" + name, en))
+            tables.append(("_D_" + name, de))
+        elif t.components != None:
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            if not t.components:
+                print("    pass", file=fout)
+            for i, c in enumerate(t.components):
+                tag, encoder, decoder, fixed = DER_Component(t, i, c)
+                if c.optional:
+                    print("    x = v.get({0!r})".format(c.key), file=fout)
+                    print("    if x is not None:", file=fout)
+                    DER_EmitEncode(tag, encoder, fixed, "x", "        ", fout)
+                else:
+                    DER_EmitEncode(tag, encoder, fixed, "v[{0!r}]".format(c.key), "    ", fout)
+            print("", file=fout)
+            print("def _d_{0}(data, pos, end, depth):".format(name), file=fout)
+            DER_EmitDepthCheck(fout)
+            print("    v = {}", file=fout)
+            for i, c in enumerate(t.components):
+                tag, encoder, decoder, fixed = DER_Component(t, i, c)
+                target = "v[{0!r}] = {{0}}".format(c.key)
+                if c.optional:
+                    print("    if pos < end and data.startswith({0!r}, pos):".format(tag), file=fout)
+                    DER_EmitDecode(tag, decoder, target, "        ", fout)
+                else:
+                    DER_EmitDecode(tag, decoder, target, "    ", fout)
+            print("    if pos != end:", file=fout)
+            print("        raise DecodeError(\"unexpected data in {0}\")".format(t.reference), file=fout)
+            print("    return v", file=fout)
+        elif t.kind == "ENUMERATED":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    x = _V_{0}.get(v)".format(name), file=fout)
+            print("    if x is None:", file=fout)
+            print("        if not isinstance(v, int):", file=fout)
+            print("            raise ValueError(\"unknown enumerator \" + repr(v) + \" for {0}\")".format(t.reference), file=fout)
+            print("        x = v", file=fout)
+            print("    buf += _int(x)", file=fout)
+            print("", file=fout)
+            print("def _d_{0}(data, s, e, depth):".format(name), file=fout)
+            print("    v = _dint(data, s, e)", file=fout)
+            print("    return _N_{0}.get(v, v)".format(name), file=fout)
+            tables.append(("_V_" + name, ["    {0!r}: {1!s},".format(x, y) for i, x, y in t.enumeration]))
+            tables.append(("_N_" + name, ["    {1!s}: {0!r},".format(x, y) for i, x, y in t.enumeration]))
+        elif t.kind == "INTEGER" and t.range:
+            check = "not {0} <= v <= {1}".format(*t.range.split(".."))
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    if " + check + ":", file=fout)
+            print("        raise ValueError(\"value out of range for {0}\")".format(t.toString()), file=fout)
+            print("    buf += _int(v)", file=fout)
+            print("", file=fout)
+            print("def _d_{0}(data, s, e, depth):".format(name), file=fout)
+            print("    v = _dint(data, s, e)", file=fout)
+            print("    if " + check + ":", file=fout)
+            print("        raise DecodeError(\"value out of range for {0}\")".format(t.toString()), file=fout)
+            print("    return v", file=fout)
+        elif t.kind == "INTEGER":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    buf += _int(v)", file=fout)
+            print("", file=fout)
+            print("_d_{0} = _dint".format(name), file=fout)
+        elif t.kind == "BOOLEAN":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    buf.append(0xff if v else 0)", file=fout)
+            print("", file=fout)
+            print("_d_{0} = _dbool".format(name), file=fout)
+        elif t.kind == "REAL":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    buf += _real(v)", file=fout)
+            print("", file=fout)
+            print("_d_{0} = _dreal".format(name), file=fout)
+        elif t.kind == "UTF8String":
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            print("    buf += v.encode(\"utf-8\")", file=fout)
+            print("", file=fout)
+            print("def _d_{0}(data, s, e, depth):".format(name), file=fout)
+            print("    try:", file=fout)
+            print("        return data[s:e].decode(\"utf-8\")", file=fout)
+            print("    except UnicodeDecodeError:", file=fout)
+            print("        raise DecodeError(\"invalid UTF8String\")", file=fout)
+        else:
+            check = None
+            if t.size:
+                check = "{{0}} not in {0!r}".format(tuple(t.size)) if len(t.size) > 1 else "{{0}} != {0!s}".format(t.size[0])
+            print("def _e_{0}(buf, v):".format(name), file=fout)
+            if check:
+                print("    if " + check.format("len(v)") + ":", file=fout)
+                print("        raise ValueError(\"wrong size for {0}\")".format(t.toString()), file=fout)
+            print("    buf += v", file=fout)
+            print("", file=fout)
+            print("def _d_{0}(data, s, e, depth):".format(name), file=fout)
+            if check:
+                print("    if " + check.format("e - s") + ":", file=fout)
+                print("        raise DecodeError(\"wrong size for {0}\")".format(t.toString()), file=fout)
+            print("    return bytes(data[s:e])", file=fout)
+
+        for i, c in enumerate(t.components or []):
+            if c.minimum != None:
+                DER_EmitSequenceOf("{0}_{1!s}".format(name, i), c.type, c.minimum, c.maximum, fout)
+
+    print("", file=fout)
+    for name, alias in aliases:
+        print("_e_{0} = _e_{1}".format(name, alias), file=fout)
+        print("_d_{0} = _d_{1}".format(name, alias), file=fout)
+
+    tables.append(("_T", ["    {0!r}: ({1!r}, _e_{2}, _d_{2}),".format(t.name, DER_UniversalTag(t), DER_Name(t)) for t in types.order]))
+    for name, lines in tables:
+        print("", file=fout)
+        print(name + " = {", file=fout)
+        for line in lines:
+            print(line, file=fout)
+        print("}", file=fout)
+
+    print('''
+
+def encode(name, value):
+    """Encode value as the information element called name."""
+    tag, encoder, decoder = _T[name]
+    buf = bytearray()
+    if tag is None:
+        encoder(buf, value)
+    else:
+        buf += tag
+        buf.append(0)
+        s = len(buf)
+        encoder(buf, value)
+        _close(buf, s)
+    return bytes(buf)
+
+
+def decode(name, data):
+    """Decode the information element called name from data."""
+    tag, encoder, decoder = _T[name]
+    end = len(data)
+    if tag is None:
+        s, e = 0, _skip(data, 0, end)
+    else:
+        s, e = _tl(data, 0, end, tag)
+    if e != end:
+        raise DecodeError("trailing data")
+    return decoder(data, s, e, 0)
+
+
+def encode_statement(name, value):
+    """Encode a (name, value) pair as a Statements CHOICE."""
+    buf = bytearray()
+    _e_Statements(buf, (name, value))
+    return bytes(buf)
+
+
+def decode_statement(data):
+    """Decode a Statements CHOICE into a (name, value) pair."""
+    return _d_Statements(data, 0, len(data), 0)''', file=fout)
+
 if __name__ == '__main__':
     main()